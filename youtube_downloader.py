@@ -1,9 +1,26 @@
 import sys
 import os
+import re
+import json
+import hashlib
+import hmac
+import ipaddress
+import threading
+import queue
+import uuid
+import time
+import socket
+import sqlite3
 import zipfile
 import shutil
+import tempfile
+import argparse
 import subprocess
+from abc import ABC, abstractmethod
 from pathlib import Path
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, urlunsplit, parse_qs
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                             QHBoxLayout, QLineEdit, QPushButton, QProgressBar,
                             QLabel, QFileDialog, QMessageBox, QComboBox,
@@ -12,9 +29,15 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
 from PySide6.QtCore import Qt, QThread, Signal, QSize, QTimer
 from PySide6.QtGui import QPixmap, QImage, QFont, QPalette, QColor, QIcon, QLinearGradient, QPainter, QBrush
 import yt_dlp
+from yt_dlp.postprocessor import PostProcessor
 import requests
 from io import BytesIO
 
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
 def get_ffmpeg_path():
     app_dir = os.path.dirname(os.path.abspath(__file__))
     ffmpeg_dir = os.path.join(app_dir, 'ffmpeg')
@@ -24,9 +47,9 @@ def get_ffmpeg_path():
     if os.path.exists(ffmpeg_exe):
         return ffmpeg_exe
     
-    # If ffmpeg doesn't exist, print a message
-    print("ffmpeg not found in the application directory.")
-    print("Please place ffmpeg.exe in a folder named 'ffmpeg' in the same directory as this script.")
+    # If ffmpeg doesn't exist, print a message (to stderr: stdout may be carrying media with --sink -)
+    print("ffmpeg not found in the application directory.", file=sys.stderr)
+    print("Please place ffmpeg.exe in a folder named 'ffmpeg' in the same directory as this script.", file=sys.stderr)
     return None
 
 # Get ffmpeg path before initializing the application
@@ -196,6 +219,634 @@ QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
 }}
 """
 
+# Hosts that serve the same YouTube videos under different URL shapes
+YOUTUBE_HOSTS = {
+    'youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com',
+    'youtube-nocookie.com', 'www.youtube-nocookie.com'
+}
+YOUTUBE_PATH_PREFIXES = ('shorts', 'embed', 'live', 'v', 'e')
+YOUTUBE_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+# Name of the yt-dlp download archive kept in each batch download folder
+ARCHIVE_FILENAME = '.download_archive.txt'
+
+def canonicalize_url(url):
+    """Map a URL to a stable (extractor, id) key and the URL to extract from.
+
+    Every YouTube form (youtu.be, shorts, embed, live, m./music. hosts and
+    watch links carrying playlist parameters) maps to ('youtube', video_id)
+    and a plain watch URL; a start timestamp is kept on the URL but not in
+    the key. Other http(s) URLs map to ('generic', normalized_url).
+    Returns (None, None) for text that is not a URL.
+    """
+    url = url.strip()
+    if not url:
+        return None, None
+    has_scheme = '://' in url
+    if not has_scheme:
+        url = 'https://' + url
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        port = parts.port
+    except ValueError:
+        return None, None
+    if parts.scheme.lower() not in ('http', 'https') or not host:
+        return None, None
+    # Bare words only count as URLs when they look like a domain
+    if not has_scheme and '.' not in host:
+        return None, None
+
+    query = parse_qs(parts.query)
+    video_id = None
+    if host == 'youtu.be':
+        video_id = parts.path.strip('/').split('/')[0]
+    elif host in YOUTUBE_HOSTS:
+        segments = [segment for segment in parts.path.split('/') if segment]
+        if segments[:1] == ['watch']:
+            video_id = query.get('v', [''])[0]
+        elif len(segments) >= 2 and segments[0] in YOUTUBE_PATH_PREFIXES:
+            video_id = segments[1]
+
+    if video_id and YOUTUBE_ID_RE.match(video_id):
+        canonical = f'https://www.youtube.com/watch?v={video_id}'
+        start = (query.get('t') or query.get('start') or [''])[0]
+        if start:
+            canonical += f'&t={start}'
+        return ('youtube', video_id), canonical
+
+    # Anything else: lowercase scheme and host, drop the fragment and a default port.
+    # Credentials and IPv6 brackets stay as they are in the netloc.
+    scheme = parts.scheme.lower()
+    userinfo, at, hostport = parts.netloc.rpartition('@')
+    netloc = userinfo + at + hostport.lower()
+    if port is not None and port == {'http': 80, 'https': 443}[scheme]:
+        netloc = netloc.rsplit(':', 1)[0]
+    normalized = urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+    return ('generic', normalized), normalized
+
+def parse_url_list(text):
+    """Split pasted or imported text into unique URLs, in input order.
+
+    Returns (entries, duplicates, invalid) where entries is a list of
+    (key, url) pairs. Deduplication happens here, before any network work.
+    """
+    entries = []
+    seen = set()
+    duplicates = 0
+    invalid = 0
+    for token in re.split(r'[\s,;]+', text):
+        if not token:
+            continue
+        key, url = canonicalize_url(token)
+        if key is None:
+            invalid += 1
+        elif key in seen:
+            duplicates += 1
+        else:
+            seen.add(key)
+            entries.append((key, url))
+    return entries, duplicates, invalid
+
+def load_archive_keys(path):
+    """Read a yt-dlp download archive into a set of (extractor, id) keys."""
+    keys = set()
+    try:
+        with open(path, encoding='utf-8') as archive:
+            for line in archive:
+                parts = line.split()
+                if len(parts) == 2:
+                    keys.add((parts[0], parts[1]))
+    except OSError:
+        pass
+    return keys
+
+@contextmanager
+def folder_lock(folder, name):
+    """Hold an exclusive lock on <folder>/<name>, shared by all processes and threads."""
+    with open(os.path.join(folder, name), 'a+b') as f:
+        if os.name == 'nt':
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK gives up after about 10 seconds; keep waiting
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+# Per-folder integrity manifest written after each completed download
+MANIFEST_FILENAME = '.manifest.json'
+MANIFEST_LOCK = '.manifest.lock'
+HASH_ALGORITHM = 'sha256'  # any hashlib name, e.g. 'blake2b'
+HASH_READ_SIZE = 1024 * 1024
+
+def current_umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+# Mode for new manifests, as open() would create them; mkstemp alone gives 0600
+MANIFEST_MODE = 0o666 & ~current_umask()
+
+# Post-processors that do not change the bytes of the downloaded file
+NON_REWRITING_PPS = {'MoveFiles', 'IntegrityManifest', 'Fsync'}
+
+def hash_file(path, algorithm=HASH_ALGORITHM):
+    digest = hashlib.new(algorithm)
+    size = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(HASH_READ_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+def load_manifest(folder):
+    """Read the folder manifest; a missing one is empty.
+
+    Any other read or parse error is raised, so that an unreadable
+    manifest is never replaced by one holding only the newest entry.
+    """
+    path = os.path.join(folder, MANIFEST_FILENAME)
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {'files': {}}
+    except ValueError as e:
+        raise ValueError(f"{path} is not valid JSON: {str(e)}")
+    if not isinstance(manifest, dict):
+        raise ValueError(f"{path} is not a manifest")
+    return manifest
+
+def update_manifest(folder, filename, entry):
+    """Add one file entry to the folder manifest and return a duplicate's name, if any.
+
+    Safe to call from several threads and processes writing to one folder.
+    """
+    with folder_lock(folder, MANIFEST_LOCK):
+        manifest = load_manifest(folder)
+        files = manifest.setdefault('files', {})
+        duplicate = None
+        for name, existing in files.items():
+            if (name != filename and existing.get('algorithm') == entry['algorithm']
+                    and existing.get('digest') == entry['digest']):
+                duplicate = name
+                break
+        files[filename] = entry
+
+        # Write to a temp file first so a crash never leaves a torn manifest
+        manifest_path = os.path.join(folder, MANIFEST_FILENAME)
+        try:
+            mode = os.stat(manifest_path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = MANIFEST_MODE
+        fd, temp_path = tempfile.mkstemp(prefix=MANIFEST_FILENAME + '.', suffix='.tmp', dir=folder)
+        try:
+            # Keep the manifest readable by the other users sharing the folder
+            os.chmod(temp_path, mode)
+            with open(fd, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+            os.replace(temp_path, manifest_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    return duplicate
+
+class StreamHasher:
+    """Hashes files while yt-dlp writes them, using its progress hooks.
+
+    yt-dlp does not hand the written bytes to its hooks, so each hook
+    reads back the bytes appended since the last one. That is still a
+    second read of every byte, but of data just written (normally still
+    in the page cache) and spread over the download, so the file needs no
+    separate pass once it is finished. Only sink downloads (see
+    DownloadWorker.stream_download) hash the bytes in memory as they are
+    written.
+
+    Merged downloads (the default 'bestvideo+bestaudio' on YouTube) are
+    not covered: ffmpeg seeks back to patch the mp4 header, so the merged
+    file is hashed once after it is written, which is a second read. The
+    separate format files that go into a merge are not hashed at all.
+    """
+    def __init__(self, algorithm=HASH_ALGORITHM):
+        self.algorithm = algorithm
+        self.states = {}
+        self.digests = {}
+        self.rewritten = False
+
+    def _read_new(self, key, path, force=False):
+        digest, offset = self.states.get(key) or (hashlib.new(self.algorithm), 0)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        if size < offset:
+            # The downloader restarted the file; start over
+            digest, offset = hashlib.new(self.algorithm), 0
+        if force or size - offset >= HASH_READ_SIZE:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                while True:
+                    chunk = f.read(HASH_READ_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    offset += len(chunk)
+        self.states[key] = (digest, offset)
+
+    def is_merge_input(self, d):
+        # yt-dlp names the formats it will merge "<name>.f<format_id>.<ext>"
+        format_id = (d.get('info_dict') or {}).get('format_id')
+        return bool(format_id) and f'.f{format_id}.' in os.path.basename(d['filename'])
+
+    def progress_hook(self, d):
+        filename = d.get('filename')
+        if not filename or filename == '-' or self.is_merge_input(d):
+            return
+        if d['status'] == 'downloading':
+            self._read_new(filename, d.get('tmpfilename') or filename)
+        elif d['status'] == 'finished':
+            # The .part file has been renamed to its final name by now
+            self._read_new(filename, filename, force=True)
+            digest, offset = self.states.pop(filename, (None, 0))
+            if digest is not None:
+                self.digests[os.path.basename(filename)] = (digest.hexdigest(), offset)
+
+    def postprocessor_hook(self, d):
+        if d['status'] == 'finished' and d.get('postprocessor') not in NON_REWRITING_PPS:
+            self.rewritten = True
+
+    def take(self, path):
+        """Return (digest, size, source) for a final output file."""
+        streamed = self.digests.get(os.path.basename(path))
+        rewritten = self.rewritten
+        # One video at a time per YoutubeDL, so nothing left over is needed again
+        self.digests.clear()
+        self.states.clear()
+        self.rewritten = False
+        if streamed and not rewritten:
+            return streamed[0], streamed[1], 'stream'
+        # Merged or fixed-up output: a second read, right after ffmpeg wrote it
+        digest, size = hash_file(path, self.algorithm)
+        return digest, size, 'output'
+
+class IntegrityManifestPP(PostProcessor):
+    def __init__(self, hasher, downloader=None):
+        super().__init__(downloader)
+        self.hasher = hasher
+
+    def run(self, info):
+        path = info.get('filepath')
+        if not path or not os.path.exists(path):
+            return [], info
+        digest, size, source = self.hasher.take(path)
+        folder, filename = os.path.split(os.path.abspath(path))
+        try:
+            duplicate = update_manifest(folder, filename, {
+                'algorithm': self.hasher.algorithm,
+                'digest': digest,
+                'size': size,
+                'id': info.get('id'),
+                'extractor': info.get('extractor_key'),
+                'source': source
+            })
+        except (OSError, ValueError) as e:
+            # The file itself is complete; don't fail the download over its manifest entry
+            self.report_warning(f'Could not update {MANIFEST_FILENAME} for "{filename}": {e}')
+            return [], info
+        self.to_screen(f'{self.hasher.algorithm} {digest} ({source}) for "{filename}"')
+        if duplicate:
+            self.to_screen(f'"{filename}" has the same content as "{duplicate}"')
+        return [], info
+
+FSYNC_POLICIES = ('never', 'finish')
+
+# Space promised to admitted, unfinished jobs, kept per directory so that
+# threads, daemon jobs and store workers on other hosts all see it
+RESERVATIONS_FILENAME = '.io_reservations.json'
+RESERVATIONS_LOCK = '.io_reservations.lock'
+RESERVATION_TTL = 6 * 3600  # drop reservations left behind by crashed processes
+
+def reserve_space(path, needed, margin):
+    """Reserve needed bytes in path; returns (reservation_id, None) or (None, reason)."""
+    os.makedirs(path, exist_ok=True)
+    with folder_lock(path, RESERVATIONS_LOCK):
+        reservations_path = os.path.join(path, RESERVATIONS_FILENAME)
+        try:
+            with open(reservations_path, encoding='utf-8') as f:
+                reservations = json.load(f)
+        except (OSError, ValueError):
+            reservations = {}
+        now = time.time()
+        reservations = {key: entry for key, entry in reservations.items()
+                        if now - entry.get('created', 0) < RESERVATION_TTL}
+        # Reserved jobs count in full until they finish, even though they
+        # have already written part of it; this errs on the safe side
+        reserved = sum(entry['bytes'] for entry in reservations.values())
+        free = shutil.disk_usage(path).free
+        if needed + reserved + margin > free:
+            return None, (f"Not enough free space in {path}: needs about {needed / (1024 * 1024):.0f} MB, "
+                          f"{free / (1024 * 1024):.0f} MB free, {reserved / (1024 * 1024):.0f} MB "
+                          f"reserved by running downloads")
+        reservation_id = uuid.uuid4().hex
+        reservations[reservation_id] = {'bytes': needed, 'created': now,
+                                        'host': socket.gethostname(), 'pid': os.getpid()}
+        with open(reservations_path, 'w', encoding='utf-8') as f:
+            json.dump(reservations, f)
+    return reservation_id, None
+
+def release_space(path, reservation_id):
+    with folder_lock(path, RESERVATIONS_LOCK):
+        reservations_path = os.path.join(path, RESERVATIONS_FILENAME)
+        try:
+            with open(reservations_path, encoding='utf-8') as f:
+                reservations = json.load(f)
+        except (OSError, ValueError):
+            return
+        if reservations.pop(reservation_id, None) is not None:
+            with open(reservations_path, 'w', encoding='utf-8') as f:
+                json.dump(reservations, f)
+
+def estimate_download_size(info):
+    """Best guess of the bytes a selected format will take, or 0 if unknown."""
+    formats = info.get('requested_formats') or [info]
+    total = 0
+    for f in formats:
+        size = f.get('filesize') or f.get('filesize_approx')
+        if not size and f.get('tbr') and info.get('duration'):
+            # tbr is in KBit/s
+            size = f['tbr'] * 125 * info['duration']
+        total += size or 0
+    return int(total)
+
+class IOProfile:
+    """Storage settings for downloads.
+
+    temp_dir keeps .part and format files on a fast disk until the final
+    file is moved into the save folder. Sizes are in bytes; None keeps
+    yt-dlp's defaults. free_space_margin is the space that must remain
+    after a job's estimated size, and the space reserved by jobs already
+    admitted, before the job is admitted.
+    """
+    def __init__(self, temp_dir=None, preallocate=True, write_buffer_size=None,
+                 http_chunk_size=None, fsync='never', free_space_margin=256 * 1024 * 1024):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {', '.join(FSYNC_POLICIES)}")
+        self.temp_dir = temp_dir
+        self.preallocate = preallocate
+        self.write_buffer_size = write_buffer_size
+        self.http_chunk_size = http_chunk_size
+        self.fsync = fsync
+        self.free_space_margin = free_space_margin
+
+    def ydl_opts(self, save_path):
+        opts = {}
+        if self.temp_dir:
+            opts['paths'] = {'home': save_path, 'temp': self.temp_dir}
+        if self.write_buffer_size:
+            # Fixed block size: every read from the socket becomes one write of this size
+            opts['buffersize'] = self.write_buffer_size
+            opts['noresizebuffer'] = True
+        if self.http_chunk_size:
+            opts['http_chunk_size'] = self.http_chunk_size
+        return opts
+
+    def admit(self, info, save_path):
+        """Reserve space for a job.
+
+        Returns (reason, reservations): reason is None if the job was
+        admitted, and reservations must be passed to release() once the
+        job is over, whatever its outcome.
+        """
+        estimate = estimate_download_size(info)
+        if not estimate:
+            return None, []
+        # Merging needs room for the format files and the merged output at once
+        temp_needed = estimate * 2 if info.get('requested_formats') else estimate
+        checks = [(self.temp_dir or save_path or '.', temp_needed)]
+        if self.temp_dir:
+            checks.append((save_path or '.', estimate))
+        reservations = []
+        for path, needed in checks:
+            try:
+                reservation_id, reason = reserve_space(path, needed, self.free_space_margin)
+            except OSError:
+                continue
+            if reason:
+                self.release(reservations)
+                return reason, []
+            reservations.append((path, reservation_id))
+        return None, reservations
+
+    def release(self, reservations):
+        for path, reservation_id in reservations:
+            try:
+                release_space(path, reservation_id)
+            except OSError:
+                pass
+        reservations.clear()
+
+def fsync_path(path):
+    with open(path, 'rb+') as f:
+        os.fsync(f.fileno())
+
+class FsyncPP(PostProcessor):
+    def run(self, info):
+        path = info.get('filepath')
+        if path and os.path.exists(path):
+            fsync_path(path)
+        return [], info
+
+# Streaming sinks read the response in chunks of this size
+STREAM_CHUNK_SIZE = 1024 * 1024
+S3_PART_SIZE = 8 * 1024 * 1024  # S3 needs at least 5 MiB per part
+
+class OutputSink(ABC):
+    """Receives the bytes of a single-stream download, in order.
+
+    Sinks are used instead of the normal yt-dlp file download when a
+    DownloadWorker is given one; each sink only ever holds a bounded
+    amount of data in memory.
+    """
+    def open(self, filename, total_size=None):
+        pass
+
+    @abstractmethod
+    def write(self, chunk):
+        pass
+
+    def close(self):
+        pass
+
+    def abort(self):
+        pass
+
+class FileSink(OutputSink):
+    def __init__(self, folder, io_profile=None):
+        self.folder = folder
+        self.io_profile = io_profile or IOProfile()
+        self.path = None
+        self.part_path = None
+        self.file = None
+        self.written = 0
+
+    def open(self, filename, total_size=None):
+        self.path = os.path.join(self.folder, filename)
+        self.part_path = os.path.join(self.io_profile.temp_dir or self.folder, filename + '.part')
+        os.makedirs(self.folder, exist_ok=True)
+        os.makedirs(os.path.dirname(self.part_path), exist_ok=True)
+        self.file = open(self.part_path, 'wb', buffering=self.io_profile.write_buffer_size or -1)
+        self.written = 0
+        if total_size and self.io_profile.preallocate:
+            # Reserve the whole file up front to avoid fragmentation
+            if hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(self.file.fileno(), 0, total_size)
+                except OSError:
+                    pass
+            else:
+                self.file.truncate(total_size)
+
+    def write(self, chunk):
+        self.file.write(chunk)
+        self.written += len(chunk)
+
+    def close(self):
+        # Drop any preallocated space the estimate overshot
+        self.file.truncate(self.written)
+        if self.io_profile.fsync == 'finish':
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        self.file.close()
+        shutil.move(self.part_path, self.path)
+
+    def abort(self):
+        if self.file:
+            self.file.close()
+        # Don't leave a preallocated, full-size .part file behind
+        if self.part_path:
+            try:
+                os.remove(self.part_path)
+            except FileNotFoundError:
+                pass
+
+class PipeSink(OutputSink):
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout.buffer
+
+    def write(self, chunk):
+        self.stream.write(chunk)
+
+    def close(self):
+        self.stream.flush()
+
+class CallbackSink(OutputSink):
+    """Hands each chunk to a callable, e.g. to feed another library without a file."""
+    def __init__(self, callback):
+        self.callback = callback
+
+    def write(self, chunk):
+        self.callback(chunk)
+
+class S3MultipartSink(OutputSink):
+    """Uploads to an S3-compatible store (e.g. a local MinIO) with multipart upload."""
+    def __init__(self, bucket, prefix='', endpoint_url=None, part_size=S3_PART_SIZE):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("S3 output needs boto3. Install it with 'pip install boto3'.")
+        self.client = boto3.client('s3', endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.part_size = part_size
+        self.key = None
+        self.upload_id = None
+        self.parts = []
+        self.buffer = bytearray()
+
+    def open(self, filename, total_size=None):
+        self.key = self.prefix + filename
+        upload = self.client.create_multipart_upload(Bucket=self.bucket, Key=self.key)
+        self.upload_id = upload['UploadId']
+        self.parts = []
+        self.buffer = bytearray()
+
+    def upload_part(self):
+        part_number = len(self.parts) + 1
+        response = self.client.upload_part(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+                                           PartNumber=part_number, Body=bytes(self.buffer))
+        self.parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+        self.buffer.clear()
+
+    def write(self, chunk):
+        self.buffer += chunk
+        if len(self.buffer) >= self.part_size:
+            self.upload_part()
+
+    def close(self):
+        if self.buffer or not self.parts:
+            self.upload_part()
+        self.client.complete_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+                                              MultipartUpload={'Parts': self.parts})
+
+    def abort(self):
+        if self.upload_id:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+
+def parse_sink(spec, save_path='.', io_profile=None):
+    """Build a sink from a CLI spec: 'file', '-'/'stdout' or 's3://bucket/prefix'.
+
+    No spec means no sink: the regular yt-dlp download, which can merge formats.
+    """
+    if not spec:
+        return None
+    if spec == 'file':
+        return FileSink(save_path, io_profile)
+    if spec in ('-', 'stdout'):
+        return PipeSink()
+    if spec.startswith('s3://'):
+        bucket, _, prefix = spec[5:].partition('/')
+        if prefix and not prefix.endswith('/'):
+            prefix += '/'
+        return S3MultipartSink(bucket, prefix, os.environ.get('S3_ENDPOINT_URL'))
+    raise ValueError(f"Unknown output sink: {spec}")
+
+def build_base_opts():
+    opts = {
+        'quiet': False,
+        'no_warnings': False,
+        'extract_flat': False,
+        'ignoreerrors': False,
+        'no_color': True,
+        'nocheckcertificate': True,
+        'socket_timeout': 30,
+        'verbose': True,
+        'no_check_certificates': True,
+        'extractor_retries': 3,
+        'format_sort': ['res', 'ext:mp4:m4a', 'codec:h264'],
+        'merge_output_format': 'mp4'
+    }
+
+    # Add ffmpeg location if available
+    if FFMPEG_PATH:
+        opts['ffmpeg_location'] = FFMPEG_PATH
+    return opts
+
 class VideoInfo:
     def __init__(self):
         self.title = ""
@@ -214,19 +865,36 @@ class DownloadWorker(QThread):
     error = Signal(str)
     info_ready = Signal(VideoInfo)
     
-    def __init__(self, url, save_path, format_id='best'):
+    def __init__(self, url, save_path, format_id='best', sink=None, io_profile=None, archive=False):
         super().__init__()
-        # Convert short URLs to full URLs
-        if 'youtu.be' in url:
-            video_id = url.split('/')[-1].split('?')[0]
-            self.url = f'https://www.youtube.com/watch?v={video_id}'
-        else:
-            self.url = url
+        # Normalize every supported URL form to one canonical URL
+        self.video_key, canonical = canonicalize_url(url)
+        self.url = canonical or url
         self.save_path = save_path
         self.format_id = format_id
+        self.sink = sink
+        self.io_profile = io_profile or IOProfile()
+        # Record the download in the folder's archive and skip it if it's already there
+        self.archive = archive
+        self.rejected = None
+        self.reservations = []
+        self.cancelled = False
+        # Set only once a cancel actually stopped the download
+        self.aborted = False
+        self.downloaded_bytes = 0
         self.is_downloading = False
         
+    def cancel(self):
+        # Takes effect at the next progress update
+        self.cancelled = True
+        
+    def check_cancelled(self):
+        if self.cancelled:
+            self.aborted = True
+            raise yt_dlp.utils.DownloadCancelled("Download cancelled")
+        
     def progress_hook(self, d):
+        self.check_cancelled()
         if d['status'] == 'downloading':
             try:
                 if 'total_bytes' in d:
@@ -244,8 +912,114 @@ class DownloadWorker(QThread):
             except:
                 pass
         elif d['status'] == 'finished':
+            self.downloaded_bytes += d.get('total_bytes') or d.get('downloaded_bytes') or 0
             self.progress.emit(100)
             
+    def admission_filter(self, info, incomplete=False):
+        # Called by yt-dlp once the formats are chosen, before any bytes are written
+        if incomplete:
+            return None
+        self.release_space()
+        self.rejected, self.reservations = self.io_profile.admit(info, self.save_path)
+        return self.rejected
+        
+    def release_space(self):
+        # Give back the space reserved at admission once a download is over
+        self.io_profile.release(self.reservations)
+        
+    def download_opts(self):
+        opts = {
+            'outtmpl': '%(title)s.%(ext)s',
+            'paths': {'home': self.save_path},
+            **self.io_profile.ydl_opts(self.save_path),
+            'match_filter': self.admission_filter
+        }
+        if self.archive:
+            opts['download_archive'] = os.path.join(self.save_path, ARCHIVE_FILENAME)
+        return opts
+        
+    def attach_manifest(self, ydl):
+        hasher = StreamHasher()
+        ydl.add_progress_hook(hasher.progress_hook)
+        ydl.add_postprocessor_hook(hasher.postprocessor_hook)
+        if self.io_profile.fsync == 'finish':
+            ydl.add_post_processor(FsyncPP(), when='after_move')
+        ydl.add_post_processor(IntegrityManifestPP(hasher), when='after_move')
+            
+    def stream_download(self, ydl_opts):
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(self.url, download=False)
+            if not info:
+                raise yt_dlp.utils.DownloadError("Could not retrieve video information")
+            if info.get('requested_formats') or info.get('protocol') not in ('http', 'https'):
+                raise yt_dlp.utils.DownloadError("Streaming output needs a single-stream HTTP format")
+            filename = os.path.basename(ydl.prepare_filename(info))
+        if isinstance(self.sink, FileSink):
+            reason, self.reservations = self.io_profile.admit(info, self.sink.folder)
+            if reason:
+                raise yt_dlp.utils.DownloadError(reason)
+
+        headers = info.get('http_headers') or {}
+        total = estimate_download_size(info)
+        exact_total = info.get('filesize')
+        # Use ranged requests where the site expects them (YouTube throttles otherwise)
+        range_size = self.io_profile.http_chunk_size or (info.get('downloader_options') or {}).get('http_chunk_size')
+        digest = hashlib.new(HASH_ALGORITHM)
+        downloaded = 0
+
+        print(f"\nStreaming {filename} to {type(self.sink).__name__}")
+        self.sink.open(filename, total or None)
+        try:
+            with requests.Session() as session:
+                while True:
+                    request_headers = dict(headers)
+                    if range_size:
+                        request_headers['Range'] = f'bytes={downloaded}-{downloaded + range_size - 1}'
+                    with session.get(info['url'], headers=request_headers, stream=True, timeout=30) as response:
+                        if response.status_code == 416 and downloaded:
+                            # Asked for bytes past the end: the previous range was the last one
+                            break
+                        response.raise_for_status()
+                        if response.status_code == 200:
+                            exact_total = int(response.headers.get('Content-Length') or 0) or exact_total
+                        elif not exact_total:
+                            # "Content-Range: bytes 0-1023/4096"
+                            size = response.headers.get('Content-Range', '').rpartition('/')[2]
+                            exact_total = int(size) if size.isdigit() else None
+                        total = exact_total or total
+                        received = 0
+                        for chunk in response.iter_content(self.io_profile.write_buffer_size or STREAM_CHUNK_SIZE):
+                            self.check_cancelled()
+                            self.sink.write(chunk)
+                            digest.update(chunk)
+                            downloaded += len(chunk)
+                            received += len(chunk)
+                            if total > 0:
+                                self.progress.emit(min(downloaded / total * 100, 100))
+                    if not range_size or response.status_code != 206 or received < range_size:
+                        break
+                    if exact_total and downloaded >= exact_total:
+                        break
+            self.sink.close()
+        except BaseException:
+            self.sink.abort()
+            raise
+        self.downloaded_bytes += downloaded
+        self.progress.emit(100)
+
+        if isinstance(self.sink, FileSink):
+            try:
+                update_manifest(self.sink.folder, filename, {
+                    'algorithm': HASH_ALGORITHM,
+                    'digest': digest.hexdigest(),
+                    'size': downloaded,
+                    'id': info.get('id'),
+                    'extractor': info.get('extractor_key'),
+                    'source': 'stream'
+                })
+            except (OSError, ValueError) as e:
+                print(f"Could not update {MANIFEST_FILENAME} for {filename}: {str(e)}")
+            
     def fetch_thumbnail(self, url):
         try:
             response = requests.get(url)
@@ -260,24 +1034,7 @@ class DownloadWorker(QThread):
         try:
             print(f"Attempting to process URL: {self.url}")
             
-            base_opts = {
-                'quiet': False,
-                'no_warnings': False,
-                'extract_flat': False,
-                'ignoreerrors': False,
-                'no_color': True,
-                'nocheckcertificate': True,
-                'socket_timeout': 30,
-                'verbose': True,
-                'no_check_certificates': True,
-                'extractor_retries': 3,
-                'format_sort': ['res', 'ext:mp4:m4a', 'codec:h264'],
-                'merge_output_format': 'mp4'
-            }
-
-            # Add ffmpeg location if available
-            if FFMPEG_PATH:
-                base_opts['ffmpeg_location'] = FFMPEG_PATH
+            base_opts = build_base_opts()
 
             # First, get available formats
             if not self.is_downloading:
@@ -358,29 +1115,806 @@ class DownloadWorker(QThread):
             else:
                 # Download with selected format
                 format_spec = self.format_id
+                if self.sink:
+                    # Sinks take one byte stream, so never pick formats that need merging
+                    if format_spec == 'best':
+                        # Not protocol^=http, which would also match http_dash_segments
+                        format_spec = 'best[protocol=https]/best[protocol=http]'
+                    try:
+                        self.stream_download({**base_opts, 'format': format_spec, 'outtmpl': '%(title)s.%(ext)s'})
+                        self.finished.emit()
+                    except Exception as e:
+                        print(f"Download error: {str(e)}")
+                        self.error.emit(f"Download Error: {str(e)}")
+                    finally:
+                        self.release_space()
+                    return
+                    
                 if format_spec == 'best':
                     format_spec = 'bestvideo+bestaudio/best'
                 
                 ydl_opts = {
                     **base_opts,
+                    **self.download_opts(),
                     'format': format_spec,
-                    'outtmpl': os.path.join(self.save_path, '%(title)s.%(ext)s'),
                     'progress_hooks': [self.progress_hook]
                 }
                 
                 with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    self.attach_manifest(ydl)
                     try:
                         print(f"\nStarting download with format: {format_spec}")
                         ydl.download([self.url])
-                        self.finished.emit()
+                        if self.rejected:
+                            self.error.emit(f"Download Error: {self.rejected}")
+                        else:
+                            self.finished.emit()
                     except Exception as e:
                         print(f"Download error: {str(e)}")
                         self.error.emit(f"Download Error: {str(e)}")
+                    finally:
+                        self.release_space()
                         
         except Exception as e:
             print(f"Fatal error: {str(e)}")
             self.error.emit(f"Fatal Error: {str(e)}")
 
+class BatchDownloadWorker(DownloadWorker):
+    item_started = Signal(int, int, str)
+    batch_finished = Signal(int, int, int)
+
+    def __init__(self, entries, save_path, format_id='best', io_profile=None):
+        super().__init__('', save_path, format_id, io_profile=io_profile)
+        self.entries = entries
+        self.is_downloading = True
+
+    def run(self):
+        archive_path = os.path.join(self.save_path, ARCHIVE_FILENAME)
+        archived = load_archive_keys(archive_path)
+
+        # Drop entries the archive already has before touching the network
+        pending = [(key, url) for key, url in self.entries if key not in archived]
+        skipped = len(self.entries) - len(pending)
+        failed = 0
+
+        format_spec = self.format_id
+        if format_spec == 'best':
+            format_spec = 'bestvideo+bestaudio/best'
+
+        ydl_opts = {
+            **build_base_opts(),
+            **self.download_opts(),
+            'format': format_spec,
+            'progress_hooks': [self.progress_hook],
+            'download_archive': archive_path
+        }
+
+        try:
+            # One YoutubeDL instance is reused for the whole batch
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                self.attach_manifest(ydl)
+                for index, (key, url) in enumerate(pending, 1):
+                    if self.cancelled:
+                        break
+                    self.url = url
+                    self.video_key = key
+                    self.item_started.emit(index, len(pending), url)
+                    self.rejected = None
+                    try:
+                        ydl.download([url])
+                        if self.rejected:
+                            failed += 1
+                            print(f"Batch download skipped {url}: {self.rejected}")
+                    except Exception as e:
+                        failed += 1
+                        print(f"Batch download error for {url}: {str(e)}")
+                    finally:
+                        self.release_space()
+        except Exception as e:
+            print(f"Fatal error: {str(e)}")
+            self.error.emit(f"Fatal Error: {str(e)}")
+            return
+
+        self.batch_finished.emit(len(pending) - failed, skipped, failed)
+
+DAEMON_HOST = '127.0.0.1'
+DAEMON_PORT = 8787
+JOB_STATES = ('queued', 'running', 'finished', 'failed', 'cancelled')
+EVENT_QUEUE_SIZE = 1000
+SSE_KEEPALIVE = 15
+
+def is_loopback_host(host):
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host.strip('[]')).is_loopback
+    except ValueError:
+        return False
+
+class Job:
+    def __init__(self, url, save_path, format_id='best'):
+        self.id = uuid.uuid4().hex[:12]
+        self.video_key, canonical = canonicalize_url(url)
+        self.url = canonical or url
+        self.save_path = save_path
+        self.format_id = format_id
+        self.state = 'queued'
+        self.progress = 0
+        self.error = None
+        self.created = time.time()
+        self.updated = self.created
+        self.worker = None
+        self.cancel_requested = False
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'url': self.url,
+            'video_key': ':'.join(self.video_key) if self.video_key else None,
+            'save_path': self.save_path,
+            'format_id': self.format_id,
+            'state': self.state,
+            'progress': self.progress,
+            'error': self.error,
+            'created': self.created,
+            'updated': self.updated
+        }
+
+class JobManager:
+    """Runs queued downloads on a fixed pool of threads and fans out events.
+
+    Each event subscriber gets a bounded queue; a subscriber that falls
+    behind loses its oldest events instead of slowing the downloads.
+    """
+    def __init__(self, save_path, concurrency=2, io_profile=None):
+        self.save_path = save_path
+        self.concurrency = concurrency
+        self.io_profile = io_profile or IOProfile()
+        self.jobs = {}
+        self.pending = queue.Queue()
+        self.lock = threading.Lock()
+        self.subscribers = {}
+
+    def start(self):
+        for _ in range(self.concurrency):
+            threading.Thread(target=self.work, daemon=True).start()
+
+    def enqueue(self, url, format_id='best', save_path=None):
+        job = Job(url, save_path or self.save_path, format_id or 'best')
+        with self.lock:
+            self.jobs[job.id] = job
+        self.pending.put(job)
+        self.publish('state', job)
+        return job
+
+    def claim(self, job):
+        # Check and set in one step so a cancel can't slip in between
+        with self.lock:
+            if job.state != 'queued':
+                return False
+            job.state = 'running'
+            job.updated = time.time()
+        self.publish('state', job)
+        return True
+
+    def resolve_save_path(self, save_path=None):
+        """Map a requested folder into the daemon's root, or None if it leaves it."""
+        root = os.path.realpath(self.save_path)
+        if not save_path:
+            return root
+        # Relative paths are taken from the root; absolute ones must already be inside it
+        path = os.path.realpath(os.path.join(root, save_path))
+        if os.path.commonpath([root, path]) != root:
+            return None
+        return path
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def list(self, state=None):
+        with self.lock:
+            jobs = list(self.jobs.values())
+        return [job for job in jobs if state is None or job.state == state]
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        with self.lock:
+            queued = job.state == 'queued'
+            if queued:
+                # claim() skips it when a worker thread comes up
+                job.state = 'cancelled'
+                job.updated = time.time()
+            elif job.state == 'running':
+                job.cancel_requested = True
+                if job.worker:
+                    job.worker.cancel()
+        if queued:
+            self.publish('state', job)
+        return job
+
+    def subscribe(self, job_id=None):
+        """Return a queue of (event_type, job) for one job, or for all jobs."""
+        events = queue.Queue(EVENT_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers[events] = job_id
+        return events
+
+    def unsubscribe(self, events):
+        with self.lock:
+            self.subscribers.pop(events, None)
+
+    def publish(self, event_type, job):
+        event = (event_type, job.to_dict())
+        with self.lock:
+            subscribers = [events for events, job_id in self.subscribers.items() if job_id in (None, job.id)]
+        for events in subscribers:
+            while True:
+                try:
+                    events.put_nowait(event)
+                    break
+                except queue.Full:
+                    try:
+                        events.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def set_state(self, job, state, error=None):
+        with self.lock:
+            job.state = state
+            job.error = error
+            job.updated = time.time()
+        self.publish('state', job)
+
+    def update_progress(self, job, value):
+        # Only publish whole-percent changes to keep the event rate low
+        value = int(value)
+        if value != job.progress:
+            job.progress = value
+            job.updated = time.time()
+            self.publish('progress', job)
+
+    def work(self):
+        while True:
+            job = self.pending.get()
+            if self.claim(job):
+                self.run_job(job)
+
+    def run_job(self, job):
+        errors = []
+        worker = DownloadWorker(job.url, job.save_path, job.format_id, io_profile=self.io_profile, archive=True)
+        worker.is_downloading = True
+        worker.progress.connect(lambda value: self.update_progress(job, value))
+        worker.error.connect(errors.append)
+        with self.lock:
+            job.worker = worker
+            if job.cancel_requested:
+                worker.cancel()
+        try:
+            worker.run()
+        finally:
+            with self.lock:
+                job.worker = None
+        # A cancel that came after the last progress update didn't stop anything
+        if worker.aborted:
+            self.set_state(job, 'cancelled')
+        elif errors:
+            self.set_state(job, 'failed', errors[0])
+        else:
+            job.progress = 100
+            self.set_state(job, 'finished')
+
+class JobAPIHandler(BaseHTTPRequestHandler):
+    """HTTP/JSON API of the download daemon.
+
+    POST /jobs                  enqueue {"url": ...} or {"urls": [...]}
+    GET  /jobs[?state=...]      list jobs
+    GET  /jobs/<id>             job status
+    POST /jobs/<id>/cancel      cancel a job (DELETE /jobs/<id> also works)
+    GET  /events[?job=<id>]     server-sent events with progress and state changes
+
+    Requests from web pages are refused: the Host header must name the
+    daemon itself and any Origin header must match it, and POST /jobs
+    only takes application/json. When the server has a token, every
+    request needs "Authorization: Bearer <token>".
+    """
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; don't let Nagle delay keep-alive replies
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        # Only trust a plain non-negative length; anything else would raise or block on read
+        length = self.headers.get('Content-Length', '').strip()
+        if not length.isdigit():
+            return None
+        try:
+            payload = json.loads(self.rfile.read(int(length)) or b'{}')
+        except ValueError:
+            return None
+        return payload if isinstance(payload, dict) else None
+
+    def route(self):
+        parts = urlsplit(self.path)
+        return [segment for segment in parts.path.split('/') if segment], parse_qs(parts.query)
+
+    def authorize(self):
+        host = self.headers.get('Host', '')
+        origin = self.headers.get('Origin')
+        if self.server.allowed_hosts is not None and host.lower() not in self.server.allowed_hosts:
+            # Blocks DNS rebinding: a browser sends the attacker's host name here
+            self.send_json(403, {'error': 'Unexpected Host header'})
+            return False
+        if origin is not None and urlsplit(origin).netloc.lower() != host.lower():
+            self.send_json(403, {'error': 'Cross-origin requests are not allowed'})
+            return False
+        if self.server.token:
+            expected = f'Bearer {self.server.token}'
+            if not hmac.compare_digest(self.headers.get('Authorization', '').encode('utf-8'), expected.encode('utf-8')):
+                self.send_json(401, {'error': 'Missing or wrong token'})
+                return False
+        return True
+
+    def do_GET(self):
+        if not self.authorize():
+            return
+        manager = self.server.manager
+        segments, query = self.route()
+        if segments == ['jobs']:
+            state = query.get('state', [None])[0]
+            self.send_json(200, {'jobs': [job.to_dict() for job in manager.list(state)]})
+        elif len(segments) == 2 and segments[0] == 'jobs':
+            job = manager.get(segments[1])
+            if job:
+                self.send_json(200, job.to_dict())
+            else:
+                self.send_json(404, {'error': 'No such job'})
+        elif segments == ['events']:
+            self.stream_events(query.get('job', [None])[0])
+        else:
+            self.send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if not self.authorize():
+            return
+        manager = self.server.manager
+        segments, _ = self.route()
+        if segments == ['jobs']:
+            # A form or text/plain POST from a web page never gets this far
+            if self.headers.get('Content-Type', '').split(';')[0].strip().lower() != 'application/json':
+                self.send_json(415, {'error': 'Expected Content-Type: application/json'})
+                return
+            payload = self.read_json()
+            if payload is None:
+                # The body can't be skipped without a valid length, so drop the connection
+                self.close_connection = True
+                self.send_json(400, {'error': 'Expected a JSON object with a valid Content-Length'})
+                return
+            urls = payload.get('urls') if 'urls' in payload else [payload.get('url')]
+            if not isinstance(urls, list):
+                urls = []
+            urls = [url for url in urls if isinstance(url, str) and url.strip()]
+            if not urls:
+                self.send_json(400, {'error': "Expected a JSON body with 'url' or 'urls'"})
+                return
+            if not isinstance(payload.get('format_id'), (str, type(None))):
+                self.send_json(400, {'error': 'format_id must be a string'})
+                return
+            save_path = payload.get('save_path')
+            save_path = manager.resolve_save_path(save_path) if isinstance(save_path, (str, type(None))) else None
+            if save_path is None:
+                self.send_json(400, {'error': f"save_path must be inside the daemon's folder {os.path.realpath(manager.save_path)}"})
+                return
+            jobs = [manager.enqueue(url, payload.get('format_id'), save_path) for url in urls]
+            if 'urls' in payload:
+                self.send_json(201, {'jobs': [job.to_dict() for job in jobs]})
+            else:
+                self.send_json(201, jobs[0].to_dict())
+        elif len(segments) == 3 and segments[0] == 'jobs' and segments[2] == 'cancel':
+            self.cancel_job(segments[1])
+        else:
+            self.send_json(404, {'error': 'Not found'})
+
+    def do_DELETE(self):
+        if not self.authorize():
+            return
+        segments, _ = self.route()
+        if len(segments) == 2 and segments[0] == 'jobs':
+            self.cancel_job(segments[1])
+        else:
+            self.send_json(404, {'error': 'Not found'})
+
+    def cancel_job(self, job_id):
+        job = self.server.manager.cancel(job_id)
+        if job:
+            self.send_json(200, job.to_dict())
+        else:
+            self.send_json(404, {'error': 'No such job'})
+
+    def write_event(self, event_type, data):
+        self.wfile.write(f"event: {event_type}\ndata: {json.dumps(data)}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+    def stream_events(self, job_id):
+        manager = self.server.manager
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        events = manager.subscribe(job_id)
+        try:
+            # Start with the current state so a late subscriber never misses the end of a job
+            if job_id:
+                job = manager.get(job_id)
+                if job is None:
+                    return
+                self.write_event('state', job.to_dict())
+            while True:
+                try:
+                    event_type, data = events.get(timeout=SSE_KEEPALIVE)
+                except queue.Empty:
+                    self.wfile.write(b': keep-alive\n\n')
+                    self.wfile.flush()
+                    continue
+                self.write_event(event_type, data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            manager.unsubscribe(events)
+
+def run_daemon(save_path, host=DAEMON_HOST, port=DAEMON_PORT, concurrency=2, io_profile=None, token=None):
+    if not token and not is_loopback_host(host):
+        raise ValueError(f"Listening on {host} needs a token")
+    manager = JobManager(save_path, concurrency, io_profile)
+    manager.start()
+    server = ThreadingHTTPServer((host, port), JobAPIHandler)
+    server.daemon_threads = True
+    server.manager = manager
+    server.token = token
+    if is_loopback_host(host):
+        names = {host, 'localhost', '127.0.0.1', '[::1]'}
+        server.allowed_hosts = {f'{name}:{port}'.lower() for name in names}
+    else:
+        # Reachable under any name on the network; the token does the checking
+        server.allowed_hosts = None
+    print(f"Download daemon listening on http://{host}:{port} (saving to {os.path.abspath(save_path)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+class DaemonClient:
+    def __init__(self, base_url, token=None):
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        if token:
+            self.session.headers['Authorization'] = f'Bearer {token}'
+
+    def check(self, response):
+        # Report the daemon's own message (e.g. a refused save_path) rather than just the status
+        if response.status_code >= 400:
+            try:
+                message = response.json()['error']
+            except (ValueError, KeyError, TypeError):
+                response.raise_for_status()
+            raise requests.HTTPError(f'{response.status_code}: {message}', response=response)
+
+    def enqueue(self, url, save_path=None, format_id='best'):
+        response = self.session.post(f'{self.base_url}/jobs', timeout=10,
+                                     json={'url': url, 'save_path': save_path, 'format_id': format_id})
+        self.check(response)
+        return response.json()
+
+    def enqueue_many(self, urls, save_path=None, format_id='best'):
+        response = self.session.post(f'{self.base_url}/jobs', timeout=30,
+                                     json={'urls': urls, 'save_path': save_path, 'format_id': format_id})
+        self.check(response)
+        return response.json()['jobs']
+
+    def status(self, job_id):
+        response = self.session.get(f'{self.base_url}/jobs/{job_id}', timeout=10)
+        self.check(response)
+        return response.json()
+
+    def cancel(self, job_id):
+        response = self.session.post(f'{self.base_url}/jobs/{job_id}/cancel', timeout=10)
+        self.check(response)
+        return response.json()
+
+    def events(self, job_id=None):
+        """Yield (event_type, job) pairs from the daemon's event stream."""
+        params = {'job': job_id} if job_id else None
+        with self.session.get(f'{self.base_url}/events', params=params, stream=True,
+                              timeout=(10, SSE_KEEPALIVE * 2)) as response:
+            self.check(response)
+            event_type, data = 'message', []
+            # chunk_size=1 so each event is handled as soon as it arrives
+            for line in response.iter_lines(chunk_size=1, decode_unicode=True):
+                if line.startswith('event:'):
+                    event_type = line[6:].strip()
+                elif line.startswith('data:'):
+                    data.append(line[5:].strip())
+                elif not line and data:
+                    yield event_type, json.loads('\n'.join(data))
+                    event_type, data = 'message', []
+
+class RemoteDownloadWorker(QThread):
+    progress = Signal(float)
+    finished = Signal()
+    error = Signal(str)
+
+    def __init__(self, client, url, save_path, format_id='best'):
+        super().__init__()
+        self.client = client
+        self.url = url
+        self.save_path = save_path
+        self.format_id = format_id
+
+    def run(self):
+        try:
+            job = self.client.enqueue(self.url, self.save_path, self.format_id)
+            for event_type, job in self.client.events(job['id']):
+                self.progress.emit(job['progress'])
+                if job['state'] == 'finished':
+                    self.finished.emit()
+                    return
+                if job['state'] in ('failed', 'cancelled'):
+                    self.error.emit(job['error'] or f"Job {job['state']}")
+                    return
+            # The stream ended without a final state (daemon restarted, connection dropped)
+            self.error.emit(f"Daemon Error: event stream closed before job {job['id']} finished")
+        except Exception as e:
+            print(f"Daemon error: {str(e)}")
+            self.error.emit(f"Daemon Error: {str(e)}")
+
+STORE_LEASE = 60  # seconds a claimed job stays assigned without a heartbeat
+STORE_POLL_INTERVAL = 2
+STORE_MAX_ATTEMPTS = 3
+STORE_RETRIES = 3  # failed store calls in a row before a worker gives up on a job
+
+class JobStore:
+    """Shared SQLite job queue for worker processes on one or more hosts.
+
+    Jobs are keyed by canonical video key, so a video is only ever queued
+    once. A worker claims a job with a time-limited lease and renews it
+    while downloading; a job whose lease ran out (its worker died) is
+    handed to the next worker that asks. Completion is only accepted from
+    the worker holding the current lease.
+
+    The database uses SQLite's default rollback journal so it keeps
+    working on network shares, where WAL mode is not safe. Hosts sharing
+    a store need roughly synchronized clocks.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.transaction():
+            self.db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                video_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                format_id TEXT NOT NULL DEFAULT 'best',
+                save_path TEXT,
+                state TEXT NOT NULL DEFAULT 'queued',
+                worker_id TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                bytes INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL)""")
+            self.db.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (state, created)")
+            self.db.execute("""CREATE TABLE IF NOT EXISTS workers (
+                worker_id TEXT PRIMARY KEY,
+                host TEXT,
+                pid INTEGER,
+                started REAL,
+                heartbeat REAL,
+                jobs_done INTEGER NOT NULL DEFAULT 0,
+                jobs_failed INTEGER NOT NULL DEFAULT 0,
+                bytes INTEGER NOT NULL DEFAULT 0)""")
+
+    @contextmanager
+    def transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can't claim the same row
+        with self.lock:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                yield
+            except BaseException:
+                self.db.execute('ROLLBACK')
+                raise
+            self.db.execute('COMMIT')
+
+    def close(self):
+        self.db.close()
+
+    def enqueue(self, entries, save_path=None, format_id='best'):
+        """Queue (key, url) pairs from parse_url_list; returns how many were new."""
+        now = time.time()
+        with self.transaction():
+            before = self.db.total_changes
+            self.db.executemany(
+                "INSERT OR IGNORE INTO jobs (video_key, url, format_id, save_path, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(':'.join(key), url, format_id, save_path, now, now) for key, url in entries])
+            return self.db.total_changes - before
+
+    def claim(self, worker_id, lease=STORE_LEASE):
+        now = time.time()
+        with self.transaction():
+            self.db.execute(
+                "UPDATE jobs SET state = 'failed', error = 'Gave up after repeated lost leases', updated = ? "
+                "WHERE state = 'running' AND lease_expires < ? AND attempts >= ?",
+                (now, now, STORE_MAX_ATTEMPTS))
+            row = self.db.execute(
+                "SELECT video_key, url, format_id, save_path, attempts FROM jobs "
+                "WHERE state = 'queued' OR (state = 'running' AND lease_expires < ?) "
+                "ORDER BY created LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            self.db.execute(
+                "UPDATE jobs SET state = 'running', worker_id = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated = ? WHERE video_key = ?",
+                (worker_id, now + lease, now, row[0]))
+        return {'video_key': row[0], 'url': row[1], 'format_id': row[2],
+                'save_path': row[3], 'attempts': row[4] + 1}
+
+    def renew(self, video_key, worker_id, lease=STORE_LEASE):
+        """Extend a lease; False means this worker no longer owns the job."""
+        now = time.time()
+        with self.transaction():
+            cursor = self.db.execute(
+                "UPDATE jobs SET lease_expires = ?, updated = ? "
+                "WHERE video_key = ? AND worker_id = ? AND state = 'running'",
+                (now + lease, now, video_key, worker_id))
+            self.db.execute("UPDATE workers SET heartbeat = ? WHERE worker_id = ?", (now, worker_id))
+            return cursor.rowcount == 1
+
+    def finish(self, video_key, worker_id, downloaded_bytes=0, error=None):
+        """Record the result of a claimed job; False if the lease was lost meanwhile."""
+        now = time.time()
+        with self.transaction():
+            if error is None:
+                cursor = self.db.execute(
+                    "UPDATE jobs SET state = 'finished', bytes = ?, error = NULL, lease_expires = NULL, updated = ? "
+                    "WHERE video_key = ? AND worker_id = ? AND state = 'running'",
+                    (downloaded_bytes, now, video_key, worker_id))
+            else:
+                # Put it back for another try unless it has used up its attempts
+                cursor = self.db.execute(
+                    "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                    "error = ?, worker_id = NULL, lease_expires = NULL, updated = ? "
+                    "WHERE video_key = ? AND worker_id = ? AND state = 'running'",
+                    (STORE_MAX_ATTEMPTS, error, now, video_key, worker_id))
+            if cursor.rowcount != 1:
+                return False
+            self.db.execute(
+                "UPDATE workers SET heartbeat = ?, jobs_done = jobs_done + ?, jobs_failed = jobs_failed + ?, "
+                "bytes = bytes + ? WHERE worker_id = ?",
+                (now, error is None, error is not None, downloaded_bytes, worker_id))
+            return True
+
+    def register_worker(self, worker_id):
+        now = time.time()
+        with self.transaction():
+            self.db.execute(
+                "INSERT OR REPLACE INTO workers (worker_id, host, pid, started, heartbeat) VALUES (?, ?, ?, ?, ?)",
+                (worker_id, socket.gethostname(), os.getpid(), now, now))
+
+    def counts(self):
+        return dict(self.db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+    def worker_stats(self):
+        rows = self.db.execute(
+            "SELECT worker_id, started, heartbeat, jobs_done, jobs_failed, bytes FROM workers ORDER BY started")
+        return [{'worker_id': worker_id, 'elapsed': max(heartbeat - started, 0.001), 'jobs_done': done,
+                 'jobs_failed': failed, 'bytes': total_bytes}
+                for worker_id, started, heartbeat, done, failed, total_bytes in rows]
+
+def format_worker_stats(stats):
+    elapsed = stats['elapsed']
+    return (f"{stats['worker_id']}: {stats['jobs_done']} done, {stats['jobs_failed']} failed in {elapsed:.1f}s "
+            f"({stats['jobs_done'] / elapsed * 60:.1f} jobs/min, "
+            f"{stats['bytes'] / elapsed / (1024 * 1024):.2f} MB/s)")
+
+def run_store_worker(store_path, save_path, lease=STORE_LEASE, io_profile=None, exit_when_idle=False):
+    store = JobStore(store_path)
+    worker_id = f'{socket.gethostname()}-{os.getpid()}'
+    store.register_worker(worker_id)
+    print(f"Worker {worker_id} pulling jobs from {store_path}")
+
+    try:
+        while True:
+            try:
+                job = store.claim(worker_id, lease)
+                idle = job is None and exit_when_idle and not store.counts().get('running')
+            except sqlite3.Error as e:
+                print(f"Could not poll the job store: {str(e)}")
+                time.sleep(STORE_POLL_INTERVAL)
+                continue
+            if idle:
+                break
+            if job is None:
+                time.sleep(STORE_POLL_INTERVAL)
+                continue
+
+            errors = []
+            worker = DownloadWorker(job['url'], job['save_path'] or save_path, job['format_id'],
+                                    io_profile=io_profile)
+            worker.is_downloading = True
+            worker.error.connect(errors.append)
+
+            # Renew the lease in the background; stop the download if it was taken away
+            done = threading.Event()
+            def heartbeat():
+                failures = 0
+                # Retry sooner after a failure, while the lease is still ours
+                while not done.wait(STORE_POLL_INTERVAL if failures else lease / 3):
+                    try:
+                        owned = store.renew(job['video_key'], worker_id, lease)
+                    except sqlite3.Error as e:
+                        failures += 1
+                        print(f"Could not renew lease on {job['video_key']} ({failures}/{STORE_RETRIES}): {str(e)}")
+                        if failures >= STORE_RETRIES:
+                            print(f"Giving up on {job['video_key']}, cancelling")
+                            worker.cancel()
+                            return
+                        continue
+                    failures = 0
+                    if not owned:
+                        print(f"Lost lease on {job['video_key']}, cancelling")
+                        worker.cancel()
+                        return
+            heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+            heartbeat_thread.start()
+            try:
+                worker.run()
+            finally:
+                done.set()
+                heartbeat_thread.join()
+
+            error = errors[0] if errors else None
+            for attempt in range(1, STORE_RETRIES + 1):
+                try:
+                    recorded = store.finish(job['video_key'], worker_id, worker.downloaded_bytes, error)
+                    break
+                except sqlite3.Error as e:
+                    print(f"Could not record result for {job['video_key']} ({attempt}/{STORE_RETRIES}): {str(e)}")
+                    time.sleep(STORE_POLL_INTERVAL)
+            else:
+                # The lease runs out and another worker picks the job up again
+                print(f"Result for {job['video_key']} not recorded, the job will be retried")
+                continue
+            if not recorded:
+                print(f"Result for {job['video_key']} discarded, the lease had expired")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        try:
+            for stats in store.worker_stats():
+                if stats['worker_id'] == worker_id:
+                    print(format_worker_stats(stats))
+        except sqlite3.Error as e:
+            print(f"Could not read worker stats: {str(e)}")
+        store.close()
+
 class VideoInfoWidget(QFrame):
     download_clicked = Signal(str)
     
@@ -651,12 +2185,17 @@ class BrandingWidget(QFrame):
         layout.addLayout(flag_container)
 
 class YouTubeDownloader(QMainWindow):
-    def __init__(self):
+    def __init__(self, daemon_url=None, daemon_token=None):
         super().__init__()
+        # When attached, downloads run in a separate daemon process
+        self.daemon = DaemonClient(daemon_url, daemon_token) if daemon_url else None
         self.initUI()
         
     def initUI(self):
-        self.setWindowTitle('CSI-VIT YouTube Downloader')
+        if self.daemon:
+            self.setWindowTitle(f'CSI-VIT YouTube Downloader (daemon: {self.daemon.base_url})')
+        else:
+            self.setWindowTitle('CSI-VIT YouTube Downloader')
         self.setMinimumSize(800, 600)
         self.setStyleSheet(STYLE_SHEET)
         
@@ -684,6 +2223,16 @@ class YouTubeDownloader(QMainWindow):
         self.url_input.textChanged.connect(self.on_url_changed)
         url_layout.addWidget(self.url_input)
         
+        self.import_btn = QPushButton('Import List')
+        self.import_btn.setProperty("secondary", True)
+        self.import_btn.clicked.connect(self.import_url_file)
+        url_layout.addWidget(self.import_btn)
+        
+        self.paste_btn = QPushButton('Paste List')
+        self.paste_btn.setProperty("secondary", True)
+        self.paste_btn.clicked.connect(self.import_clipboard)
+        url_layout.addWidget(self.paste_btn)
+        
         self.browse_btn = QPushButton('Select Folder')
         self.browse_btn.setProperty("secondary", True)
         self.browse_btn.clicked.connect(self.browse_location)
@@ -706,6 +2255,11 @@ class YouTubeDownloader(QMainWindow):
         self.location_label.setProperty("info", True)
         status_layout.addWidget(self.location_label)
         
+        self.batch_label = QLabel('')
+        self.batch_label.setProperty("info", True)
+        self.batch_label.hide()
+        status_layout.addWidget(self.batch_label)
+        
         self.progress = QProgressBar()
         self.progress.setFixedHeight(8)
         status_layout.addWidget(self.progress)
@@ -714,6 +2268,9 @@ class YouTubeDownloader(QMainWindow):
         
         self.save_path = ''
         self.current_worker = None
+        # Kept apart so single downloads and info lookups can't drop a running batch
+        self.batch_worker = None
+        self.retired_workers = []
         self.url_check_timer = QTimer()
         self.url_check_timer.setSingleShot(True)
         self.url_check_timer.timeout.connect(self.fetch_video_info)
@@ -737,11 +2294,18 @@ class YouTubeDownloader(QMainWindow):
             
         self.progress.setValue(0)
         
+        self.retire_worker()
         self.current_worker = DownloadWorker(self.url_input.text(), "")
         self.current_worker.info_ready.connect(self.handle_video_info)
         self.current_worker.error.connect(self.handle_error)
         self.current_worker.start()
         
+    def retire_worker(self):
+        # Qt aborts if a running QThread is garbage-collected; hold on to it until it ends
+        self.retired_workers = [worker for worker in self.retired_workers if not worker.isFinished()]
+        if self.current_worker and self.current_worker.isRunning():
+            self.retired_workers.append(self.current_worker)
+        
     def handle_video_info(self, video_info):
         self.video_info.update_info(video_info)
         
@@ -762,13 +2326,98 @@ class YouTubeDownloader(QMainWindow):
             
         self.progress.setValue(0)
         
-        self.current_worker = DownloadWorker(self.url_input.text(), self.save_path, format_id)
+        self.retire_worker()
+        if self.daemon:
+            self.current_worker = RemoteDownloadWorker(self.daemon, self.url_input.text(), self.save_path, format_id)
+        else:
+            self.current_worker = DownloadWorker(self.url_input.text(), self.save_path, format_id)
+            self.current_worker.is_downloading = True
         self.current_worker.progress.connect(self.update_progress)
         self.current_worker.finished.connect(self.download_finished)
         self.current_worker.error.connect(self.handle_error)
-        self.current_worker.is_downloading = True
         self.current_worker.start()
         
+    def import_url_file(self):
+        file_name, _ = QFileDialog.getOpenFileName(self, 'Import URL List', '', 'Text Files (*.txt);;All Files (*)')
+        if not file_name:
+            return
+        try:
+            with open(file_name, encoding='utf-8', errors='replace') as f:
+                text = f.read()
+        except OSError as e:
+            QMessageBox.warning(self, 'Error', f'Could not read file: {str(e)}')
+            return
+        self.start_batch(text)
+        
+    def import_clipboard(self):
+        self.start_batch(QApplication.clipboard().text())
+        
+    def start_batch(self, text):
+        if self.batch_worker:
+            QMessageBox.warning(self, 'Error', 'A bulk import is already running')
+            return
+        if not self.save_path:
+            QMessageBox.warning(self, 'Error', 'Please select a save location')
+            return
+            
+        entries, duplicates, invalid = parse_url_list(text)
+        if not entries:
+            QMessageBox.warning(self, 'Error', 'No valid URLs found')
+            return
+            
+        print(f"Batch import: {len(entries)} unique URLs, {duplicates} duplicates, {invalid} invalid")
+        if self.daemon:
+            # The daemon checks the archive too, but don't queue what is known to be done
+            archived = load_archive_keys(os.path.join(self.save_path, ARCHIVE_FILENAME))
+            pending = [url for key, url in entries if key not in archived]
+            skipped = len(entries) - len(pending)
+            jobs = []
+            if pending:
+                try:
+                    jobs = self.daemon.enqueue_many(pending, self.save_path)
+                except Exception as e:
+                    self.handle_error(f"Daemon Error: {str(e)}")
+                    return
+            self.batch_label.setText(f'Batch: {len(jobs)} jobs queued on daemon '
+                                     f'({skipped} already archived, {duplicates} duplicates removed)')
+            self.batch_label.show()
+            return
+            
+        self.batch_label.setText(f'Batch: {len(entries)} unique URLs ({duplicates} duplicates removed)')
+        self.batch_label.show()
+        self.progress.setValue(0)
+        
+        self.set_batch_running(True)
+        self.batch_worker = BatchDownloadWorker(entries, self.save_path)
+        self.batch_worker.progress.connect(self.update_progress)
+        self.batch_worker.item_started.connect(self.update_batch_status)
+        self.batch_worker.batch_finished.connect(self.batch_finished)
+        self.batch_worker.error.connect(self.batch_failed)
+        self.batch_worker.start()
+        
+    def set_batch_running(self, running):
+        # One batch at a time; a second import would replace the running worker
+        self.import_btn.setEnabled(not running)
+        self.paste_btn.setEnabled(not running)
+        if not running and self.batch_worker:
+            # The worker emits its last signal just before run() returns
+            self.batch_worker.wait()
+            self.batch_worker = None
+        
+    def update_batch_status(self, index, total, url):
+        self.progress.setValue(0)
+        self.batch_label.setText(f'Batch: downloading {index} of {total} - {url}')
+        
+    def batch_failed(self, error_msg):
+        self.set_batch_running(False)
+        self.handle_error(error_msg)
+        
+    def batch_finished(self, downloaded, skipped, failed):
+        self.set_batch_running(False)
+        self.batch_label.setText(f'Batch: {downloaded} downloaded, {skipped} already archived, {failed} failed')
+        QMessageBox.information(self, 'Batch Complete',
+                                f'Downloaded: {downloaded}\nAlready in archive: {skipped}\nFailed: {failed}')
+        
     def update_progress(self, value):
         self.progress.setValue(int(value))
         
@@ -778,7 +2427,131 @@ class YouTubeDownloader(QMainWindow):
     def handle_error(self, error_msg):
         QMessageBox.critical(self, 'Error', f'Operation failed: {error_msg}')
 
-if __name__ == '__main__':
+def parse_size(value):
+    size = yt_dlp.utils.parse_bytes(value)
+    if size is None:
+        raise argparse.ArgumentTypeError(f"invalid size: {value}")
+    return size
+
+def build_io_profile(args):
+    return IOProfile(temp_dir=args.temp_dir,
+                     preallocate=not args.no_preallocate,
+                     write_buffer_size=args.buffer_size,
+                     http_chunk_size=args.http_chunk_size,
+                     fsync=args.fsync,
+                     free_space_margin=args.min_free)
+
+def run_headless(args):
+    sink_spec = args.output_sink
+    pipe = None
+    if sink_spec in ('-', 'stdout'):
+        # Keep stdout for the media bytes; send all logging to stderr
+        pipe = sys.stdout.buffer
+        sys.stdout = sys.stderr
+
+    # Same deduplication as the GUI and the job store, before any network work
+    entries, duplicates, invalid = parse_url_list('\n'.join(args.urls))
+    if duplicates or invalid:
+        print(f"{len(entries)} unique URLs ({duplicates} duplicates, {invalid} invalid)", file=sys.stderr)
+
+    io_profile = build_io_profile(args)
+    failed = invalid
+    for _, url in entries:
+        errors = []
+        sink = PipeSink(pipe) if pipe else parse_sink(sink_spec, args.output or '.', io_profile)
+        worker = DownloadWorker(url, args.output or '.', args.format, sink=sink, io_profile=io_profile)
+        worker.is_downloading = True
+        worker.error.connect(errors.append)
+        worker.run()
+        if errors:
+            failed += 1
+            print(errors[0], file=sys.stderr)
+    return 1 if failed else 0
+
+def run_store_command(args):
+    if args.worker:
+        run_store_worker(args.store, args.output or '.', args.lease, build_io_profile(args), args.exit_when_idle)
+        return 0
+
+    store = JobStore(args.store)
+    try:
+        if args.urls:
+            entries, duplicates, invalid = parse_url_list('\n'.join(args.urls))
+            # Without -o each worker saves into its own output folder
+            save_path = os.path.abspath(args.output) if args.output else None
+            added = store.enqueue(entries, save_path, args.format)
+            print(f"Queued {added} new jobs ({len(entries) - added} already in store, "
+                  f"{duplicates} duplicates, {invalid} invalid)")
+        counts = store.counts()
+        print('Jobs: ' + ', '.join(f'{state} {counts.get(state, 0)}' for state in ('queued', 'running', 'finished', 'failed')))
+        if args.stats:
+            for stats in store.worker_stats():
+                print(format_worker_stats(stats))
+    finally:
+        store.close()
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description='CSI-VIT YouTube Downloader. Starts the GUI when no URL is given.')
+    parser.add_argument('urls', nargs='*', help='download these URLs without opening the GUI')
+    parser.add_argument('-o', '--output', help='download folder (default: current folder)')
+    parser.add_argument('-i', '--input-file', help='also read URLs from this text file')
+    parser.add_argument('-f', '--format', default='best', help='yt-dlp format id (default: best)')
+    parser.add_argument('--sink', dest='output_sink',
+                        help="stream a single-stream format without yt-dlp's downloader: 'file' (into the "
+                             "output folder, preallocated), '-' for stdout, or s3://bucket/prefix (endpoint "
+                             "from S3_ENDPOINT_URL). Default: the regular yt-dlp download.")
+    daemon = parser.add_argument_group('daemon')
+    daemon.add_argument('--serve', action='store_true',
+                        help='run the local job API daemon instead of the GUI')
+    daemon.add_argument('--host', default=DAEMON_HOST, help=f'daemon address (default: {DAEMON_HOST})')
+    daemon.add_argument('--port', type=int, default=DAEMON_PORT, help=f'daemon port (default: {DAEMON_PORT})')
+    daemon.add_argument('--jobs', type=int, default=2, help='downloads the daemon runs at once (default: 2)')
+    daemon.add_argument('--attach', metavar='URL',
+                        help='start the GUI and send downloads to a running daemon, e.g. http://127.0.0.1:8787')
+    daemon.add_argument('--token', default=os.environ.get('YTD_DAEMON_TOKEN'),
+                        help='shared secret for the daemon API; required with a non-loopback --host '
+                             '(default: $YTD_DAEMON_TOKEN)')
+    store = parser.add_argument_group('shared job store')
+    store.add_argument('--store', metavar='PATH',
+                       help='SQLite job store shared by worker processes; given URLs are queued there, not downloaded')
+    store.add_argument('--worker', action='store_true', help='pull and download jobs from --store')
+    store.add_argument('--lease', type=int, default=STORE_LEASE,
+                       help=f'seconds before a silent worker loses its job (default: {STORE_LEASE})')
+    store.add_argument('--exit-when-idle', action='store_true', help='stop the worker once the store is drained')
+    store.add_argument('--stats', action='store_true', help='print job counts and per-worker throughput of --store')
+    storage = parser.add_argument_group('storage')
+    storage.add_argument('--temp-dir', help='keep partial files here until they are complete')
+    storage.add_argument('--buffer-size', type=parse_size, help='read/write block size, e.g. 1M')
+    storage.add_argument('--http-chunk-size', type=parse_size, help='size of each ranged HTTP request, e.g. 10M')
+    storage.add_argument('--fsync', choices=FSYNC_POLICIES, default='never',
+                         help='flush finished files to disk (default: never)')
+    storage.add_argument('--no-preallocate', action='store_true',
+                         help='do not reserve file space up front with --sink file')
+    storage.add_argument('--min-free', type=parse_size, default='256M',
+                         help='free space to leave after a job; larger jobs are refused (default: 256M)')
+    args = parser.parse_args()
+
+    if args.input_file:
+        with open(args.input_file, encoding='utf-8', errors='replace') as f:
+            # Split later by parse_url_list, which also handles commas and semicolons
+            args.urls.append(f.read())
+
+    if args.store:
+        return run_store_command(args)
+    if args.worker:
+        parser.error('--worker needs --store')
+    if args.serve:
+        if not args.token and not is_loopback_host(args.host):
+            parser.error(f'--host {args.host} exposes the daemon to the network; set --token as well')
+        run_daemon(args.output or '.', args.host, args.port, args.jobs, build_io_profile(args), args.token)
+        return 0
+    if args.urls:
+        return run_headless(args)
+
     app = QApplication(sys.argv)
-    ex = YouTubeDownloader()
-    sys.exit(app.exec()) 
\ No newline at end of file
+    ex = YouTubeDownloader(args.attach, args.token)
+    return app.exec()
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file